@@ -7,8 +7,10 @@ Fluxo:
   1. Lê `items.json` com campos: title, url, subtitle, impact.
   2. Para cada item, abre a URL no Playwright e captura um screenshot
      *acima da dobra* (viewport 1080x1920, sem scroll).
-  3. Salva os screenshots em shots/ (ou --shots-dir).
-  4. Chama make_story.py para compor o Story final (fundo + overlay + texto).
+  3. Mantém os screenshots (JPEG) em memória; com --keep-shots, também
+     os salva em shots/ (ou --shots-dir).
+  4. Importa make_story.py e chama render() para compor o Story final
+     (fundo + overlay + texto).
   5. Grava os PNGs finais no --out-dir.
 
 Uso:
@@ -21,32 +23,208 @@ Uso:
   # flags opcionais:
   --browser chromium|firefox|webkit  (padrão: chromium)
   --timeout 30000                    (ms por página)
+  --net-idle-ms 5000                 (espera máx. pela rede ociosa)
+  --ws-endpoint ws://127.0.0.1:3000/<token>
+                                     (usa servidor de scripts/playwright_server.py)
+  --workers 4                        (capturas em paralelo)
+  --cache-ttl 86400                  (reutiliza shots com menos de N s; implica --keep-shots)
+  --keep-shots                       (salva os shots em --shots-dir)
   --skip-screenshots                 (reutiliza shots existentes)
 
 Dependências (venv):
   playwright  +  playwright install chromium
-  pillow
+  pillow, numpy, orjson
 """
 
 from __future__ import annotations
 
 import argparse
-import json
-import subprocess
+import asyncio
+import os
 import sys
-import tempfile
+import time
 from pathlib import Path
+from typing import TYPE_CHECKING
+
+import orjson
+
+if TYPE_CHECKING:
+    from playwright.async_api import BrowserContext, Page, Route
+
+# make_story.py mora ao lado deste script; importamos direto (sem subprocess).
+sys.path.insert(0, str(Path(__file__).resolve().parent))
 
 VIEWPORT_W = 1080
 VIEWPORT_H = 1920
 
+# O screenshot só vira fundo borrado/escurecido: JPEG basta e codifica rápido.
+SHOT_QUALITY = 85
+
+# Tenta primeiro sem JavaScript (páginas renderizadas no servidor ficam prontas
+# mais cedo); um JPEG menor que isto é tratado como página vazia e
+# recapturado com JS ligado.
+MIN_SHOT_BYTES = 40_000
+
+# Cada navegador serializa seus screenshots; paralelizamos com N navegadores
+# (com --ws-endpoint, N pares de contextos no navegador do servidor).
+MAX_WORKERS = 4
+
+CONTEXT_OPTIONS = {
+    "viewport": {"width": VIEWPORT_W, "height": VIEWPORT_H},
+    "device_scale_factor": 1,
+    "user_agent": (
+        "Mozilla/5.0 (Linux; Android 12; Pixel 6) "
+        "AppleWebKit/537.36 (KHTML, like Gecko) "
+        "Chrome/120.0.0.0 Mobile Safari/537.36"
+    ),
+}
+
+# Recursos que não aparecem num screenshot estático acima da dobra.
+BLOCKED_RESOURCE_TYPES = frozenset(
+    {"media", "font", "websocket", "eventsource", "manifest", "other"}
+)
+
+# Sinal de que o conteúdo principal já está visível.
+READY_SELECTOR = "main, article, h1"
+
+
+async def _block_heavy(route: Route) -> None:
+    if route.request.resource_type in BLOCKED_RESOURCE_TYPES:
+        await route.abort()
+    else:
+        await route.continue_()
+
+
+async def _wait_until_ready(page: Page, net_idle_ms: int) -> None:
+    """Espera a rede ociosa e o conteúdo principal, em vez de um sleep fixo."""
+    try:
+        await page.wait_for_load_state("networkidle", timeout=net_idle_ms)
+    except Exception:
+        pass  # páginas com polling/analytics nunca ficam ociosas
+    try:
+        await page.wait_for_selector(READY_SELECTOR, state="visible", timeout=1000)
+    except Exception:
+        pass
+
+
+async def _new_page(context: BrowserContext) -> Page:
+    """Abre uma aba reutilizável, já com o bloqueio de recursos instalado."""
+    page = await context.new_page()
+    await page.route("**/*", _block_heavy)
+    return page
+
+
+async def take_screenshot(
+    page: Page, url: str, timeout: int, net_idle_ms: int
+) -> tuple[bytes, bool]:
+    """Navega `page` até `url` e captura o topo da página (above the fold).
 
-def take_screenshot(
-    url: str, out_path: Path, browser_type: str, timeout: int
+    Devolve o JPEG em memória e se a navegação concluiu; após uma falha a
+    aba pode ficar num estado ruim e deve ser recriada.
+    """
+    # Aba reaproveitada: limpa antes, para que uma navegação que falhe não
+    # capture o artigo anterior.
+    await page.goto("about:blank")
+    loaded = True
+    try:
+        await page.goto(url, wait_until="domcontentloaded", timeout=timeout)
+    except Exception as exc:
+        loaded = False
+        print(f"  [aviso] Erro ao carregar {url}: {exc}", file=sys.stderr)
+    else:
+        await _wait_until_ready(page, net_idle_ms)
+
+    # Apenas o viewport visível = acima da dobra
+    data = await page.screenshot(
+        type="jpeg",
+        quality=SHOT_QUALITY,
+        animations="disabled",
+        clip={"x": 0, "y": 0, "width": VIEWPORT_W, "height": VIEWPORT_H},
+    )
+    return data, loaded
+
+
+def save_shot(path: Path, url: str, data: bytes) -> None:
+    """Grava o screenshot e, ao lado (`.url`), a URL de onde ele veio.
+
+    Escreve num arquivo temporário e troca com os.replace: se `path` for um
+    hard link de um item duplicado, o link é quebrado em vez de sobrescrever
+    o shot do item original.
+    """
+    for target, payload in ((path, data), (path.with_suffix(".url"), url.encode())):
+        tmp = target.with_name(target.name + ".tmp")
+        tmp.write_bytes(payload)
+        os.replace(tmp, target)
+
+
+def is_fresh(path: Path, url: str, ttl: int) -> bool:
+    """True se `path` é um shot de `url` gravado há menos de `ttl` segundos."""
+    if ttl <= 0 or not path.exists():
+        return False
+    try:
+        cached_url = path.with_suffix(".url").read_text(encoding="utf-8")
+    except OSError:
+        return False
+    if cached_url != url:
+        return False
+    return (time.time() - path.stat().st_mtime) < ttl
+
+
+async def _worker(
+    contexts: tuple[BrowserContext, BrowserContext],
+    queue: asyncio.Queue,
+    total: int,
+    args: argparse.Namespace,
+    shots: dict[int, bytes],
 ) -> None:
-    """Captura o topo da página (above the fold) via Playwright."""
+    """Consome itens da fila até esvaziá-la, sempre nos mesmos contextos.
+
+    `contexts` é o par (sem JS, com JS) de um mesmo navegador; cada um tem
+    uma única aba, reaproveitada entre URLs.
+    """
+    pages = [await _new_page(c) for c in contexts]
+
+    async def capture(slot: int, url: str) -> bytes:
+        data, loaded = await take_screenshot(
+            pages[slot], url, args.timeout, args.net_idle_ms
+        )
+        if not loaded:
+            await pages[slot].close()
+            pages[slot] = await _new_page(contexts[slot])
+        return data
+
+    try:
+        while True:
+            try:
+                i, url, out_path = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            print(f"  [{i}/{total}] {url}")
+            data = await capture(0, url)
+            if len(data) < MIN_SHOT_BYTES:
+                print("         → [js] página vazia sem JavaScript, recapturando")
+                data = await capture(1, url)
+            shots[i] = data
+            if args.keep_shots:
+                save_shot(out_path, url, data)
+                print(f"         → salvo em {out_path}")
+    finally:
+        for page in pages:
+            await page.close()
+
+
+async def run_all(
+    jobs: list[tuple[int, str, Path]], total: int, args: argparse.Namespace
+) -> dict[int, bytes]:
+    """Distribui `jobs` (índice, url, destino) entre até --workers workers.
+
+    Cada worker tem seu próprio navegador, ou, com --ws-endpoint, seu próprio
+    par de contextos no navegador único do servidor.
+
+    Devolve os screenshots capturados, indexados pelo número do item.
+    """
     try:
-        from playwright.sync_api import sync_playwright
+        from playwright.async_api import async_playwright
     except ImportError:
         sys.exit(
             "playwright não encontrado. Execute:\n"
@@ -54,32 +232,44 @@ def take_screenshot(
             "  playwright install chromium"
         )
 
-    with sync_playwright() as p:
-        factory = {"chromium": p.chromium, "firefox": p.firefox, "webkit": p.webkit}
-        browser = factory.get(browser_type, p.chromium).launch(headless=True)
-        context = browser.new_context(
-            viewport={"width": VIEWPORT_W, "height": VIEWPORT_H},
-            device_scale_factor=1,
-            user_agent=(
-                "Mozilla/5.0 (Linux; Android 12; Pixel 6) "
-                "AppleWebKit/537.36 (KHTML, like Gecko) "
-                "Chrome/120.0.0.0 Mobile Safari/537.36"
-            ),
-        )
-        page = context.new_page()
+    shots: dict[int, bytes] = {}
+    queue: asyncio.Queue = asyncio.Queue()
+    for job in jobs:
+        queue.put_nowait(job)
+    k = max(1, min(len(jobs), args.workers))
 
+    async with async_playwright() as p:
+        factory = {"chromium": p.chromium, "firefox": p.firefox, "webkit": p.webkit}
+        launcher = factory.get(args.browser, p.chromium)
+        if args.ws_endpoint:
+            # Servidor persistente (scripts/playwright_server.py): sem cold start.
+            # Uma conexão só; os workers dividem o mesmo navegador.
+            browsers = [await launcher.connect(args.ws_endpoint)]
+            hosts = browsers * k
+        else:
+            browsers = await asyncio.gather(
+                *(launcher.launch(headless=True) for _ in range(k))
+            )
+            hosts = browsers
         try:
-            page.goto(url, wait_until="domcontentloaded", timeout=timeout)
-            page.wait_for_timeout(2000)
-        except Exception as exc:
-            print(f"  [aviso] Erro ao carregar {url}: {exc}", file=sys.stderr)
-
-        # Apenas o viewport visível = acima da dobra
-        page.screenshot(
-            path=str(out_path),
-            clip={"x": 0, "y": 0, "width": VIEWPORT_W, "height": VIEWPORT_H},
-        )
-        browser.close()
+            nojs = await asyncio.gather(
+                *(
+                    b.new_context(**CONTEXT_OPTIONS, java_script_enabled=False)
+                    for b in hosts
+                )
+            )
+            js = await asyncio.gather(
+                *(b.new_context(**CONTEXT_OPTIONS) for b in hosts)
+            )
+            contexts = list(zip(nojs, js))
+            await asyncio.gather(
+                *(_worker(c, queue, total, args, shots) for c in contexts)
+            )
+        finally:
+            await asyncio.gather(
+                *(b.close() for b in browsers), return_exceptions=True
+            )
+    return shots
 
 
 def main() -> None:
@@ -94,7 +284,7 @@ def main() -> None:
     ap.add_argument(
         "--shots-dir",
         default="shots",
-        help="Pasta para salvar screenshots (padrão: shots/)",
+        help="Pasta dos screenshots salvos/reutilizados (padrão: shots/)",
     )
     ap.add_argument(
         "--out-dir",
@@ -113,12 +303,46 @@ def main() -> None:
         default=30000,
         help="Timeout em ms por página (padrão: 30000)",
     )
+    ap.add_argument(
+        "--net-idle-ms",
+        type=int,
+        default=5000,
+        help="Espera máxima (ms) pela rede ociosa após carregar a página (padrão: 5000)",
+    )
+    ap.add_argument(
+        "--ws-endpoint",
+        default=None,
+        help="Conecta a um servidor Playwright já ativo (ws://...) em vez de abrir o navegador",
+    )
+    ap.add_argument(
+        "--workers",
+        type=int,
+        default=MAX_WORKERS,
+        help=(
+            f"Capturas em paralelo (padrão: {MAX_WORKERS}): um navegador por "
+            "worker, ou um par de contextos por worker com --ws-endpoint"
+        ),
+    )
+    ap.add_argument(
+        "--cache-ttl",
+        type=int,
+        default=0,
+        help="Reutiliza shots da mesma URL com menos de N s (ex.: 86400; padrão: 0 = desligado)",
+    )
+    ap.add_argument(
+        "--keep-shots",
+        action="store_true",
+        help="Também salva os shots em --shots-dir (implícito com --cache-ttl)",
+    )
     ap.add_argument(
         "--skip-screenshots",
         action="store_true",
         help="Pula a captura; usa screenshots já existentes em --shots-dir",
     )
     args = ap.parse_args()
+    if args.cache_ttl > 0:
+        # o cache só funciona se os shots desta execução forem gravados
+        args.keep_shots = True
 
     # ------------------------------------------------------------------
     # 1. Carrega items.json
@@ -127,14 +351,15 @@ def main() -> None:
     if not items_path.exists():
         sys.exit(f"Arquivo não encontrado: {items_path}")
 
-    items: list[dict] = json.loads(items_path.read_text(encoding="utf-8"))
+    items: list[dict] = orjson.loads(items_path.read_bytes())
     if not items:
         sys.exit("items.json está vazio.")
 
     print(f"→ {len(items)} item(s) carregado(s) de {items_path}")
 
     shots_dir = Path(args.shots_dir)
-    shots_dir.mkdir(parents=True, exist_ok=True)
+    if args.keep_shots:
+        shots_dir.mkdir(parents=True, exist_ok=True)
 
     out_dir = Path(args.out_dir)
     out_dir.mkdir(parents=True, exist_ok=True)
@@ -142,6 +367,9 @@ def main() -> None:
     # ------------------------------------------------------------------
     # 2. Screenshots
     # ------------------------------------------------------------------
+    shots: dict[int, bytes] = {}
+    # item repetido → primeiro item com a mesma URL (capturado uma vez só)
+    dup_of: dict[int, int] = {}
     if args.skip_screenshots:
         print("→ [skip] Reutilizando screenshots existentes em", shots_dir)
     else:
@@ -149,52 +377,69 @@ def main() -> None:
             f"→ Capturando {len(items)} screenshot(s) "
             f"({args.browser}, {VIEWPORT_W}x{VIEWPORT_H})..."
         )
+        jobs = []
+        url_to_first: dict[str, int] = {}
         for i, item in enumerate(items, start=1):
             url = item.get("url", "").strip()
             if not url:
                 print(f"  [aviso] Item {i} sem URL, pulando.", file=sys.stderr)
                 continue
-            out_path = shots_dir / f"shot_{i:02d}.png"
-            print(f"  [{i}/{len(items)}] {url}")
-            take_screenshot(url, out_path, args.browser, args.timeout)
-            print(f"         → salvo em {out_path}")
+            first = url_to_first.setdefault(url, i)
+            if first != i:
+                dup_of[i] = first
+                print(f"  [{i}/{len(items)}] [dup] mesma URL do item {first}")
+                continue
+            shot_path = shots_dir / f"shot_{i:02d}.jpg"
+            if is_fresh(shot_path, url, args.cache_ttl):
+                print(f"  [{i}/{len(items)}] [cache] {shot_path}")
+                continue
+            jobs.append((i, url, shot_path))
+        if jobs:
+            shots = asyncio.run(run_all(jobs, len(items), args))
+
+        if args.keep_shots:
+            for i, first in dup_of.items():
+                src = shots_dir / f"shot_{first:02d}.jpg"
+                dst = shots_dir / f"shot_{i:02d}.jpg"
+                if src.exists():
+                    dst.unlink(missing_ok=True)
+                    os.link(src, dst)
+                    dst.with_suffix(".url").write_text(
+                        items[i - 1]["url"].strip(), encoding="utf-8"
+                    )
 
     # ------------------------------------------------------------------
-    # 3. Monta lista aumentada com campo 'screenshot'
+    # 3. Monta lista aumentada com campo 'screenshot' (bytes ou caminho)
     # ------------------------------------------------------------------
     augmented = []
     for i, item in enumerate(items, start=1):
-        shot_path = shots_dir / f"shot_{i:02d}.png"
-        if not shot_path.exists():
+        key = dup_of.get(i, i)
+        shot_path = shots_dir / f"shot_{key:02d}.jpg"
+        aug = dict(item)
+        if key in shots:
+            aug["screenshot"] = shots[key]
+        elif shot_path.exists():
+            aug["screenshot"] = str(shot_path)
+        else:
             sys.exit(
                 f"Screenshot ausente: {shot_path}\n"
                 "Rode sem --skip-screenshots ou verifique shots/."
             )
-        aug = dict(item)
-        aug["screenshot"] = str(shot_path)
         augmented.append(aug)
 
     # ------------------------------------------------------------------
-    # 4. Chama make_story.py
+    # 4. Compõe os Stories com make_story.render (mesmo processo)
     # ------------------------------------------------------------------
-    with tempfile.NamedTemporaryFile(
-        mode="w", suffix=".json", delete=False, encoding="utf-8"
-    ) as tmp:
-        json.dump(augmented, tmp, ensure_ascii=False, indent=2)
-        tmp_path = tmp.name
-
-    make_story = Path(__file__).resolve().parent / "make_story.py"
-    if not make_story.exists():
-        sys.exit(f"make_story.py não encontrado em {make_story}")
+    try:
+        import make_story
+    except ImportError as exc:
+        sys.exit(
+            f"Falha ao importar make_story.py ({exc}). Execute:\n"
+            "  pip install -r requirements.txt"
+        )
 
-    cmd = [sys.executable, str(make_story), "--in", tmp_path, "--out-dir", str(out_dir)]
     print(f"\n→ Compondo Stories com make_story.py → {out_dir}/")
-    result = subprocess.run(cmd, text=True)
-
-    Path(tmp_path).unlink(missing_ok=True)
-
-    if result.returncode != 0:
-        sys.exit(f"make_story.py falhou (código {result.returncode})")
+    make_story.render_all(augmented, out_dir)
 
     # ------------------------------------------------------------------
     # 5. Resumo
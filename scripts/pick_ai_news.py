@@ -4,6 +4,10 @@
 Reads feeds from a file (one URL per line). Filters entries from last N hours and by keywords.
 Outputs JSON list of candidates: [{title,url,source,published}]
 
+Feeds are fetched with conditional GET (ETag/Last-Modified); unchanged feeds
+reuse the entries cached in ~/.cache/pick_ai_news/feeds.json (see --cache,
+--no-cache).
+
 Usage:
   python pick_ai_news.py --feeds /path/to/feeds.txt --hours 24 --limit 15
 """
@@ -12,14 +16,18 @@ from __future__ import annotations
 
 import argparse
 import datetime as dt
-import json
 import re
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
 import feedparser
+import orjson
 
 KEYWORDS = re.compile(r"\b(ai|artificial intelligence|llm|agent|agents|copilot|gemini|openai|anthropic|deepmind|model|models|inference|training|chip|gpu|nvidia)\b", re.I)
 
+FETCH_WORKERS = 16
+CACHE_FILE = Path.home() / '.cache' / 'pick_ai_news' / 'feeds.json'
+
 
 def read_feeds(path: str) -> list[str]:
     lines = Path(path).read_text(encoding='utf-8').splitlines()
@@ -40,39 +48,100 @@ def parse_dt(entry) -> dt.datetime | None:
     return dt.datetime(*t[:6], tzinfo=dt.timezone.utc)
 
 
+def load_cache(path: Path) -> dict:
+    try:
+        return orjson.loads(path.read_bytes())
+    except (OSError, ValueError):
+        return {}
+
+
+def save_cache(path: Path, cache: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_bytes(orjson.dumps(cache))
+
+
+def entry_record(e) -> dict:
+    # plain, JSON-serializable view of a feedparser entry
+    when = parse_dt(e)
+    return {
+        'title': (getattr(e, 'title', '') or '').strip(),
+        'link': (getattr(e, 'link', '') or '').strip(),
+        'summary': (getattr(e, 'summary', '') or '').strip(),
+        'published': when.isoformat() if when else None,
+    }
+
+
+def fetch_feed(url: str, cached: dict) -> dict:
+    # Conditional GET: feedparser sends If-None-Match / If-Modified-Since and
+    # gets a body-less 304 when the feed is unchanged.
+    d = feedparser.parse(url, etag=cached.get('etag'), modified=cached.get('modified'))
+    if d.get('status') == 304 and 'entries' in cached:
+        return cached
+    failed = 'status' not in d or (d.get('bozo') and not d.entries)
+    if failed and cached.get('entries'):
+        # network error/timeout: keep the last good copy (and its etag)
+        return cached
+    return {
+        'etag': d.get('etag'),
+        'modified': d.get('modified'),
+        'source': d.feed.get('title') or d.feed.get('link') or url,
+        'entries': [entry_record(e) for e in d.entries or []],
+    }
+
+
+def fetch_feeds(urls: list[str], cache: dict) -> list[tuple[str, dict]]:
+    # Each parse is a blocking HTTP GET; overlap them across threads.
+    # ex.map keeps results in the same order as the feeds file.
+    if not urls:
+        return []
+    with ThreadPoolExecutor(max_workers=min(FETCH_WORKERS, len(urls))) as ex:
+        feeds = ex.map(lambda u: fetch_feed(u, cache.get(u, {})), urls)
+        return list(zip(urls, feeds))
+
+
 def main():
     ap = argparse.ArgumentParser()
     ap.add_argument('--feeds', required=True)
     ap.add_argument('--hours', type=int, default=24)
     ap.add_argument('--limit', type=int, default=15)
+    ap.add_argument('--cache', default=str(CACHE_FILE), help='ETag/Last-Modified cache file')
+    ap.add_argument('--no-cache', action='store_true')
     args = ap.parse_args()
 
     now = dt.datetime.now(dt.timezone.utc)
     cutoff = now - dt.timedelta(hours=args.hours)
 
+    cache_path = Path(args.cache).expanduser()
+    cache = {} if args.no_cache else load_cache(cache_path)
+
+    search = KEYWORDS.search
+    fromiso = dt.datetime.fromisoformat
     cands = []
-    for url in read_feeds(args.feeds):
-        d = feedparser.parse(url)
-        src = (d.feed.get('title') or d.feed.get('link') or url)
-        for e in d.entries or []:
-            title = (getattr(e, 'title', '') or '').strip()
-            link = (getattr(e, 'link', '') or '').strip()
-            summary = (getattr(e, 'summary', '') or '').strip()
-            blob = f"{title} {summary}"
-            if not KEYWORDS.search(blob):
+    append = cands.append
+    for url, feed in fetch_feeds(read_feeds(args.feeds), cache):
+        cache[url] = feed
+        src = feed['source']
+        for e in feed['entries'] or ():
+            title = e['title']
+            summary = e['summary']
+            if not search(''.join((title, ' ', summary))):
                 continue
-            when = parse_dt(e)
+            link = e['link']
+            when = fromiso(e['published']) if e['published'] else None
             if when and when < cutoff:
                 continue
             if not link:
                 continue
-            cands.append({
+            append({
                 'title': title,
                 'url': link,
                 'source': src,
                 'published': when.isoformat().replace('+00:00','Z') if when else None,
             })
 
+    if not args.no_cache:
+        save_cache(cache_path, cache)
+
     # naive dedupe by url
     seen = set()
     deduped = []
@@ -85,7 +154,7 @@ def main():
     # keep newest first when published known
     deduped.sort(key=lambda x: x['published'] or '', reverse=True)
 
-    print(json.dumps(deduped[: args.limit], ensure_ascii=False, indent=2))
+    print(orjson.dumps(deduped[: args.limit], option=orjson.OPT_INDENT_2).decode())
 
 
 if __name__ == '__main__':
@@ -0,0 +1,92 @@
+#!/usr/bin/env python3
+"""playwright_server.py
+=====================
+Mantém um navegador Playwright rodando como servidor, para que execuções
+repetidas de gen_stories_from_urls.py (cron, pipelines) não paguem o
+cold start do navegador a cada vez.
+
+Uso:
+  python scripts/playwright_server.py --browser chromium --port 3000
+  # imprime o endpoint, p.ex. ws://127.0.0.1:3000/<token>; em outro
+  # terminal / no cron:
+  python scripts/gen_stories_from_urls.py --items items.json \
+      --ws-endpoint ws://127.0.0.1:3000/<token>
+
+O servidor escuta só em 127.0.0.1, num caminho aleatório: quem conhece o
+endpoint controla o navegador (e o usuário do SO), então não o compartilhe.
+
+O --browser do servidor deve ser o mesmo passado a gen_stories_from_urls.py.
+Encerre com Ctrl+C.
+
+Dependências (venv):
+  playwright  +  playwright install chromium
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import secrets
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+HOST = "127.0.0.1"
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(
+        description="Servidor Playwright persistente para gen_stories_from_urls.py"
+    )
+    ap.add_argument(
+        "--browser",
+        choices=["chromium", "firefox", "webkit"],
+        default="chromium",
+        help="Motor do Playwright (padrão: chromium)",
+    )
+    ap.add_argument(
+        "--port",
+        type=int,
+        default=3000,
+        help="Porta do endpoint WebSocket (padrão: 3000)",
+    )
+    args = ap.parse_args()
+
+    try:
+        import playwright  # noqa: F401
+    except ImportError:
+        sys.exit(
+            "playwright não encontrado. Execute:\n"
+            "  pip install playwright\n"
+            "  playwright install chromium"
+        )
+
+    # A API Python não expõe launch_server(); usamos o comando equivalente
+    # do driver empacotado com o pacote playwright.
+    ws_path = secrets.token_urlsafe(16)
+    config = {"headless": True, "host": HOST, "port": args.port, "wsPath": ws_path}
+    with tempfile.NamedTemporaryFile(
+        mode="w", suffix=".json", delete=False, encoding="utf-8"
+    ) as tmp:
+        json.dump(config, tmp)
+        cfg_path = tmp.name
+
+    cmd = [
+        sys.executable, "-m", "playwright", "launch-server",
+        "--browser", args.browser, "--config", cfg_path,
+    ]
+    print(f"→ ws://{HOST}:{args.port}/{ws_path}  ({args.browser})", flush=True)
+    try:
+        result = subprocess.run(cmd)
+    except KeyboardInterrupt:
+        result = None
+    finally:
+        Path(cfg_path).unlink(missing_ok=True)
+
+    if result is not None and result.returncode != 0:
+        sys.exit(f"playwright launch-server falhou (código {result.returncode})")
+
+
+if __name__ == "__main__":
+    main()